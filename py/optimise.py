@@ -3,75 +3,233 @@
 Grid search optimization for threshold parameter.
 """
 
+import argparse
 import subprocess
 import sys
 import os
-import pandas as pd
+import re
+import hashlib
+import tempfile
 import numpy as np
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CACHE_DIR = ".artemis_cache"
+
+# Minimal environment for artemis: avoids copying the full parent env into
+# every forked subprocess once the pool is running many of them
+_SUBPROCESS_ENV = {'PATH': os.environ.get('PATH', '')}
+
+# Matches both metric lines from artemis output, e.g.
+#   Sharpe Ratio: 1.2345
+#   Max Drawdown: 4.56%
+# The exponent part matters: std::cout prints small doubles %g-style
+# (e.g. 9.4e-05), which a bare digits-and-dot class would truncate to 9.4
+_METRICS_RE = re.compile(r'(Sharpe Ratio|Max Drawdown):\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)%?')
+
+def _cache_key(data_file, artemis_path):
+    """Cache key covering the data file contents and the artemis build.
+
+    Including the executable's mtime invalidates cached results whenever
+    artemis is rebuilt.
+    """
+    with open(data_file, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    return f"{digest}_{int(os.path.getmtime(artemis_path))}"
+
+def run_backtest(data_file, threshold, artemis_path, cache_key=None):
+    """Run backtest with given threshold and parse output.
+
+    When a cache_key is given, results are memoized on disk so repeated or
+    overlapping searches skip already-evaluated thresholds.
+    """
+    cache_file = None
+    if cache_key:
+        cache_file = os.path.join(CACHE_DIR, f"{cache_key}_{threshold:.4f}.json")
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                return json.load(f)
 
-def run_backtest(data_file, threshold, artemis_path):
-    """Run backtest with given threshold and parse output."""
     try:
-        result = subprocess.run(
-            [artemis_path, data_file, str(threshold)],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__))
-        )
-        
-        if result.returncode != 0:
-            print(f"Error running backtest: {result.stderr}")
-            return None
-        
-        # Parse output
-        output = result.stdout
-        sharpe = None
-        max_dd = None
-        
-        for line in output.split('\n'):
-            if 'Sharpe Ratio:' in line:
-                try:
-                    sharpe = float(line.split(':')[1].strip())
-                except:
-                    pass
-            if 'Max Drawdown:' in line:
-                try:
-                    max_dd = float(line.split(':')[1].strip().replace('%', ''))
-                except:
-                    pass
-        
-        return {'sharpe': sharpe, 'max_dd': max_dd, 'threshold': threshold}
-    
+        # artemis rewrites results.csv, results_trades.csv, and artemis.log in
+        # its working directory, so each backtest gets a private temp dir to
+        # keep parallel runs from clobbering each other's output files
+        with tempfile.TemporaryDirectory(prefix='artemis_run_') as run_dir:
+            process = subprocess.Popen(
+                [artemis_path, os.path.abspath(data_file), str(threshold)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=run_dir,
+                env=_SUBPROCESS_ENV
+            )
+
+            # Parse stdout as it streams instead of buffering the whole
+            # output; stop reading once both metrics have been seen
+            sharpe = None
+            max_dd = None
+
+            for line in process.stdout:
+                m = _METRICS_RE.search(line)
+                if m:
+                    if m.group(1) == 'Sharpe Ratio':
+                        sharpe = float(m.group(2))
+                    else:
+                        max_dd = float(m.group(2))
+                    if sharpe is not None and max_dd is not None:
+                        break
+
+            process.stdout.close()
+            returncode = process.wait()
+
+            if returncode != 0 and (sharpe is None or max_dd is None):
+                print(f"Error running backtest: {process.stderr.read()}")
+                process.stderr.close()
+                return None
+
+            process.stderr.close()
+
+        result = {'sharpe': sharpe, 'max_dd': max_dd, 'threshold': threshold}
+
+        if cache_file and sharpe is not None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file, 'w') as f:
+                json.dump(result, f)
+
+        return result
+
     except Exception as e:
         print(f"Exception running backtest: {e}")
         return None
 
-def grid_search(data_file, artemis_path, threshold_min=1.5, threshold_max=4.0, step=0.1):
-    """Perform grid search over threshold parameter."""
-    thresholds = np.arange(threshold_min, threshold_max + step, step)
-    results = []
-    
-    print(f"Running grid search over {len(thresholds)} thresholds...")
-    print(f"Range: {threshold_min} to {threshold_max} (step: {step})")
-    
-    for i, threshold in enumerate(thresholds):
-        print(f"\n[{i+1}/{len(thresholds)}] Testing threshold: {threshold:.1f}")
-        result = run_backtest(data_file, threshold, artemis_path)
-        if result:
-            results.append(result)
-            print(f"  Sharpe: {result['sharpe']:.4f}, Max DD: {result['max_dd']:.2f}%")
-        else:
-            print(f"  Failed to get results")
-    
-    return results
+def _eval_grid(data_file, artemis_path, thresholds, jobs=None, cache_key=None):
+    """Evaluate a set of thresholds, one backtest each.
+
+    Each backtest is an independent subprocess, so they are dispatched to a
+    pool of worker processes instead of running serially. Returns sharpe and
+    max_dd arrays aligned with the thresholds; failed runs stay NaN.
+    """
+    n = len(thresholds)
+    sharpe = np.full(n, np.nan)
+    max_dd = np.full(n, np.nan)
+
+    if jobs is None:
+        jobs = os.cpu_count()
+
+    print(f"Evaluating {n} thresholds (jobs: {jobs})...")
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(run_backtest, data_file, float(threshold), artemis_path, cache_key): i
+            for i, threshold in enumerate(thresholds)
+        }
+
+        completed = 0
+        for future in as_completed(futures):
+            completed += 1
+            i = futures[future]
+            result = future.result()
+            if result and result['sharpe'] is not None:
+                sharpe[i] = result['sharpe']
+                max_dd[i] = result['max_dd']
+                print(f"[{completed}/{n}] Threshold {thresholds[i]:.2f}: "
+                      f"Sharpe: {sharpe[i]:.4f}, Max DD: {max_dd[i]:.2f}%")
+            else:
+                print(f"[{completed}/{n}] Threshold {thresholds[i]:.2f}: failed to get results")
+
+    return sharpe, max_dd
+
+def grid_search(data_file, artemis_path, threshold_min=1.5, threshold_max=4.0, jobs=None):
+    """Two-stage coarse-to-fine grid search over the threshold parameter.
+
+    A coarse pass (step 0.5) locates the promising region, then a fine pass
+    (step 0.05) refines around the best coarse result. This spends fewer
+    backtests overall than a uniform fine grid while giving higher effective
+    resolution near the optimum. Returns a DataFrame built from typed arrays
+    (no dict-list type inference); failed runs appear as NaN rows.
+    """
+    # Deferred so --help, bad-path exits, and the pool workers that re-import
+    # this module for run_backtest never pay the pandas import cost
+    import pandas as pd
+
+    coarse_step = 0.5
+    fine_step = 0.05
+    fine_radius = 0.3
+
+    cache_key = _cache_key(data_file, artemis_path)
+
+    coarse_thresholds = np.arange(threshold_min, threshold_max + fine_step / 2, coarse_step)
+    print(f"Coarse pass: {threshold_min} to {threshold_max} (step: {coarse_step})")
+    coarse_sharpe, coarse_mdd = _eval_grid(data_file, artemis_path, coarse_thresholds,
+                                           jobs=jobs, cache_key=cache_key)
+
+    if np.isnan(coarse_sharpe).all():
+        return pd.DataFrame(columns=['threshold', 'sharpe', 'max_dd'])
+
+    best_coarse = coarse_thresholds[np.nanargmax(coarse_sharpe)]
+    fine_min = max(threshold_min, best_coarse - fine_radius)
+    fine_max = min(threshold_max, best_coarse + fine_radius)
+    fine_thresholds = np.arange(fine_min, fine_max + fine_step / 2, fine_step)
+
+    print(f"\nFine pass around {best_coarse:.2f}: {fine_min:.2f} to {fine_max:.2f} (step: {fine_step})")
+    fine_sharpe, fine_mdd = _eval_grid(data_file, artemis_path, fine_thresholds,
+                                       jobs=jobs, cache_key=cache_key)
+
+    thresholds = np.concatenate([coarse_thresholds, fine_thresholds])
+    sharpe = np.concatenate([coarse_sharpe, fine_sharpe])
+    max_dd = np.concatenate([coarse_mdd, fine_mdd])
+
+    # Merge the two passes, dropping thresholds evaluated in both
+    keys = np.round(thresholds / fine_step).astype(np.int64)
+    _, unique_idx = np.unique(keys, return_index=True)
+
+    return pd.DataFrame({
+        'threshold': thresholds[unique_idx],
+        'sharpe': sharpe[unique_idx],
+        'max_dd': max_dd[unique_idx],
+    })
+
+def random_search(data_file, artemis_path, threshold_min=1.5, threshold_max=4.0, n=30, jobs=None):
+    """Sobol-sampled search over the threshold parameter.
+
+    Equivalent to grid search for this single parameter, but scales to
+    multi-parameter sweeps where a full grid blows up exponentially: the
+    low-discrepancy sequence covers the space evenly at any sample budget.
+    """
+    import pandas as pd
+    from scipy.stats import qmc
+
+    cache_key = _cache_key(data_file, artemis_path)
+
+    sampler = qmc.Sobol(d=1, seed=0)
+    u = sampler.random(n).ravel()
+    thresholds = np.sort(threshold_min + u * (threshold_max - threshold_min))
+
+    print(f"Random (Sobol) search: {n} samples in [{threshold_min}, {threshold_max}]")
+    sharpe, max_dd = _eval_grid(data_file, artemis_path, thresholds, jobs=jobs, cache_key=cache_key)
+
+    return pd.DataFrame({'threshold': thresholds, 'sharpe': sharpe, 'max_dd': max_dd})
 
 def main():
-    if len(sys.argv) < 2:
-        data_file = "data/ES_futures_sample.csv"
-    else:
-        data_file = sys.argv[1]
-    
+    parser = argparse.ArgumentParser(description="Optimize the signal threshold parameter.")
+    parser.add_argument('data_file', nargs='?', default="data/ES_futures_sample.csv",
+                        help="tick data CSV to backtest on")
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid',
+                        help="coarse-to-fine grid or Sobol random search")
+    parser.add_argument('--n', type=int, default=30,
+                        help="sample count for random search")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="parallel backtest workers; tune against the threads "
+                             "each artemis process may spawn itself")
+    args = parser.parse_args()
+
+    data_file = args.data_file
+
     if not os.path.exists(data_file):
         print(f"Error: Data file {data_file} not found")
         sys.exit(1)
@@ -110,15 +268,17 @@ def main():
     os.chdir(project_root)
     
     # Run grid search
-    results = grid_search(data_file, artemis_path, threshold_min=1.5, threshold_max=4.0, step=0.1)
-    
-    if not results:
+    if args.search == 'random':
+        df = random_search(data_file, artemis_path, threshold_min=1.5, threshold_max=4.0,
+                           n=args.n, jobs=args.jobs)
+    else:
+        df = grid_search(data_file, artemis_path, threshold_min=1.5, threshold_max=4.0,
+                         jobs=args.jobs)
+
+    if df.empty or df['sharpe'].isna().all():
         print("No results obtained from grid search")
         sys.exit(1)
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(results)
-    
+
     # Find best result
     best_idx = df['sharpe'].idxmax()
     best_result = df.loc[best_idx]
@@ -126,7 +286,7 @@ def main():
     print("\n" + "="*50)
     print("OPTIMIZATION RESULTS")
     print("="*50)
-    print(f"\nBest Threshold: {best_result['threshold']:.1f}")
+    print(f"\nBest Threshold: {best_result['threshold']:.2f}")
     print(f"Best Sharpe Ratio: {best_result['sharpe']:.4f}")
     print(f"Corresponding Max Drawdown: {best_result['max_dd']:.2f}%")
     
@@ -141,8 +301,12 @@ def main():
         'max_dd': float(best_result['max_dd'])
     }
     
-    with open('best_parameters.json', 'w') as f:
-        json.dump(best_params, f, indent=2)
+    if orjson is not None:
+        with open('best_parameters.json', 'wb') as f:
+            f.write(orjson.dumps(best_params, option=orjson.OPT_INDENT_2))
+    else:
+        with open('best_parameters.json', 'w') as f:
+            json.dump(best_params, f, indent=2)
     
     print("Best parameters saved to best_parameters.json")
     
@@ -4,73 +4,186 @@ Read and visualize backtest results from Artemis.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
 import sys
 import os
 
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (14, 8)
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernels run as plain Python loops
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+# Filled in by _setup_plotting; matplotlib and seaborn together cost around
+# a second to import, so the plot paths load them on first use and --help,
+# error exits, and cache-hit loads skip them entirely
+Figure = None
+FigureCanvasAgg = None
+
+def _setup_plotting():
+    """Lazy-import matplotlib/seaborn and apply the shared plot style."""
+    global Figure, FigureCanvasAgg
+    if Figure is not None:
+        return
+    import matplotlib
+    from matplotlib.figure import Figure as _Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as _FigureCanvasAgg
+    import seaborn as sns
+
+    sns.set_style("whitegrid")
+    matplotlib.rcParams['figure.figsize'] = (14, 8)
+    Figure = _Figure
+    FigureCanvasAgg = _FigureCanvasAgg
+
+def _save_figure(fig, path):
+    """Render a Figure straight through the Agg backend.
+
+    Bypasses the pyplot state machine, so no global figure registry to
+    manage and no plt.close() bookkeeping per plot.
+    """
+    FigureCanvasAgg(fig).print_figure(path, dpi=150, bbox_inches='tight')
+    print(f"Saved {path}")
+
+def _parquet_fresh(pq_path, csv_path):
+    """Whether a Parquet copy exists and is at least as new as its CSV."""
+    return os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(csv_path)
 
 def load_results(results_file="results.csv", trades_file="results_trades.csv"):
-    """Load equity curve and trades data."""
-    equity_df = pd.read_csv(results_file)
-    equity_df['timestamp'] = pd.to_datetime(equity_df['timestamp'], unit='us')
-    equity_df.set_index('timestamp', inplace=True)
-    
+    """Load equity curve and trades data.
+
+    Parsing goes through pyarrow's multi-threaded CSV reader with explicit
+    column types, then hands the buffers to pandas without an extra copy.
+    Only the columns the plots and summary actually use are materialized,
+    and equity is kept as float32, which halves memory on large files.
+    The first load also writes a Parquet copy next to each CSV, which is
+    preferred on later runs while it is newer than the CSV.
+    """
+    pq_path = results_file.replace('.csv', '.parquet')
+    if _parquet_fresh(pq_path, results_file):
+        equity_df = pd.read_parquet(pq_path)
+    else:
+        table = pv.read_csv(
+            results_file,
+            convert_options=pv.ConvertOptions(
+                include_columns=['timestamp', 'equity'],
+                column_types={'timestamp': pa.int64(), 'equity': pa.float32()}
+            )
+        )
+        equity_df = table.to_pandas(self_destruct=True)
+        equity_df.index = pd.to_datetime(equity_df.pop('timestamp'), unit='us')
+        equity_df.to_parquet(pq_path, compression='zstd')
+
     trades_df = None
     if os.path.exists(trades_file):
-        trades_df = pd.read_csv(trades_file)
-        trades_df['entry_time'] = pd.to_datetime(trades_df['entry_time'], unit='us')
-        trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'], unit='us')
-        trades_df['duration'] = trades_df['duration_us'] / 1e6  # Convert to seconds
-    
+        pq_path = trades_file.replace('.csv', '.parquet')
+        if _parquet_fresh(pq_path, trades_file):
+            trades_df = pd.read_parquet(pq_path)
+        else:
+            table = pv.read_csv(
+                trades_file,
+                convert_options=pv.ConvertOptions(
+                    column_types={'entry_time': pa.int64(), 'exit_time': pa.int64()}
+                )
+            )
+            trades_df = table.to_pandas(self_destruct=True)
+            trades_df['entry_time'] = pd.to_datetime(trades_df['entry_time'], unit='us')
+            trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'], unit='us')
+            trades_df['duration'] = trades_df['duration_us'] / 1e6  # Convert to seconds
+            trades_df.to_parquet(pq_path, compression='zstd')
+
     return equity_df, trades_df
 
+def _downsample(series, max_points=5000):
+    """Stride-downsample a series for plotting.
+
+    The saved PNGs are only a few thousand pixels wide, so drawing more
+    points than that costs matplotlib time without changing the image.
+    """
+    if len(series) <= max_points:
+        return series
+    return series.iloc[::len(series) // max_points]
+
 def plot_equity_curve(equity_df):
     """Plot equity curve."""
-    fig, ax = plt.subplots(figsize=(14, 6))
-    ax.plot(equity_df.index, equity_df['equity'], linewidth=1.5, color='#2E86AB')
+    _setup_plotting()
+    equity = _downsample(equity_df['equity'])
+
+    fig = Figure(figsize=(14, 6))
+    ax = fig.subplots()
+    ax.plot(equity.index, equity.values, linewidth=1.5, color='#2E86AB')
     ax.set_xlabel('Time', fontsize=12)
     ax.set_ylabel('Equity ($)', fontsize=12)
     ax.set_title('Equity Curve', fontsize=14, fontweight='bold')
     ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('equity_curve.png', dpi=300, bbox_inches='tight')
-    print("Saved equity_curve.png")
-    plt.close()
+    fig.tight_layout()
+    _save_figure(fig, 'equity_curve.png')
+
+@njit(cache=True)
+def _rolling_sharpe_kernel(returns, window):
+    """Rolling mean/std Sharpe in a single pass over the returns array."""
+    n = returns.size
+    out = np.full(n, np.nan)
+    s = 0.0
+    s2 = 0.0
+    for i in range(n):
+        s += returns[i]
+        s2 += returns[i] * returns[i]
+        if i >= window:
+            s -= returns[i - window]
+            s2 -= returns[i - window] * returns[i - window]
+        if i >= window - 1:
+            mu = s / window
+            var = s2 / window - mu * mu
+            out[i] = mu / np.sqrt(var) if var > 0 else 0.0
+    return out
 
 def plot_rolling_sharpe(equity_df, window=1000):
     """Plot rolling Sharpe ratio."""
+    _setup_plotting()
     returns = equity_df['equity'].pct_change().dropna()
-    rolling_sharpe = returns.rolling(window=window).mean() / returns.rolling(window=window).std() * np.sqrt(252 * 24 * 60 * 60)
-    
-    fig, ax = plt.subplots(figsize=(14, 6))
-    ax.plot(rolling_sharpe.index, rolling_sharpe, linewidth=1.5, color='#A23B72')
+
+    # Annualize by the observed tick rate (252 trading days) instead of a
+    # hard-coded seconds-per-year constant
+    median_interval_s = np.median(np.diff(returns.index.values.astype(np.int64))) / 1e9
+    ticks_per_year = 252 * 24 * 60 * 60 / median_interval_s
+
+    sharpe = _rolling_sharpe_kernel(returns.to_numpy(dtype=np.float64), window)
+    rolling_sharpe = pd.Series(sharpe * np.sqrt(ticks_per_year), index=returns.index)
+
+    rolling_sharpe = _downsample(rolling_sharpe)
+
+    fig = Figure(figsize=(14, 6))
+    ax = fig.subplots()
+    ax.plot(rolling_sharpe.index, rolling_sharpe.values, linewidth=1.5, color='#A23B72')
     ax.axhline(y=0, color='r', linestyle='--', alpha=0.5)
     ax.set_xlabel('Time', fontsize=12)
     ax.set_ylabel('Rolling Sharpe Ratio', fontsize=12)
     ax.set_title(f'Rolling Sharpe Ratio (window={window})', fontsize=14, fontweight='bold')
     ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('rolling_sharpe.png', dpi=300, bbox_inches='tight')
-    print("Saved rolling_sharpe.png")
-    plt.close()
+    fig.tight_layout()
+    _save_figure(fig, 'rolling_sharpe.png')
 
 def plot_parameter_heatmap(results_data, threshold_range, sharpe_values):
     """Plot parameter heatmap (threshold vs Sharpe)."""
     if len(sharpe_values) == 0:
         print("No optimization data available")
         return
-    
+
+    _setup_plotting()
+
     # Create heatmap data
     heatmap_data = pd.DataFrame({
         'threshold': threshold_range,
         'sharpe': sharpe_values
     })
     
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
     ax.plot(heatmap_data['threshold'], heatmap_data['sharpe'], marker='o', linewidth=2, markersize=6)
     ax.set_xlabel('Threshold', fontsize=12)
     ax.set_ylabel('Sharpe Ratio', fontsize=12)
@@ -83,20 +196,21 @@ def plot_parameter_heatmap(results_data, threshold_range, sharpe_values):
     max_sharpe = heatmap_data.loc[max_idx, 'sharpe']
     ax.plot(max_threshold, max_sharpe, 'r*', markersize=20, label=f'Max: {max_sharpe:.2f} @ {max_threshold:.1f}')
     ax.legend()
-    
-    plt.tight_layout()
-    plt.savefig('parameter_heatmap.png', dpi=300, bbox_inches='tight')
-    print("Saved parameter_heatmap.png")
-    plt.close()
+
+    fig.tight_layout()
+    _save_figure(fig, 'parameter_heatmap.png')
 
 def plot_trade_distribution(trades_df):
     """Plot trade PnL distribution."""
     if trades_df is None or len(trades_df) == 0:
         print("No trades data available")
         return
-    
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-    
+
+    _setup_plotting()
+
+    fig = Figure(figsize=(14, 5))
+    axes = fig.subplots(1, 2)
+
     # PnL distribution
     axes[0].hist(trades_df['pnl'], bins=50, edgecolor='black', alpha=0.7, color='#F18F01')
     axes[0].axvline(x=0, color='r', linestyle='--', linewidth=2)
@@ -111,11 +225,9 @@ def plot_trade_distribution(trades_df):
     axes[1].set_ylabel('Frequency', fontsize=12)
     axes[1].set_title('Trade Duration Distribution', fontsize=12, fontweight='bold')
     axes[1].grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('trade_distribution.png', dpi=300, bbox_inches='tight')
-    print("Saved trade_distribution.png")
-    plt.close()
+
+    fig.tight_layout()
+    _save_figure(fig, 'trade_distribution.png')
 
 def main():
     if len(sys.argv) > 1:
@@ -137,20 +249,32 @@ def main():
     plot_rolling_sharpe(equity_df)
     plot_trade_distribution(trades_df)
     
-    # Print summary statistics
+    # Print summary statistics, reducing over the raw numpy arrays once
+    # instead of issuing a pandas scan per line
+    equity = equity_df['equity'].to_numpy()
+    equity_first, equity_last = equity[0], equity[-1]
+    equity_max, equity_min = equity.max(), equity.min()
+
+    # Max drawdown against the running peak; a whole-series min/max ratio
+    # ignores time ordering and understates (or zeroes) the real drawdown
+    running_peak = np.maximum.accumulate(equity)
+    max_drawdown = ((running_peak - equity) / running_peak).max() * 100
+
     print("\n=== Summary Statistics ===")
-    print(f"Initial Equity: ${equity_df['equity'].iloc[0]:,.2f}")
-    print(f"Final Equity: ${equity_df['equity'].iloc[-1]:,.2f}")
-    print(f"Total Return: {(equity_df['equity'].iloc[-1] / equity_df['equity'].iloc[0] - 1) * 100:.2f}%")
-    print(f"Max Equity: ${equity_df['equity'].max():,.2f}")
-    print(f"Min Equity: ${equity_df['equity'].min():,.2f}")
-    print(f"Max Drawdown: {(1 - equity_df['equity'].min() / equity_df['equity'].max()) * 100:.2f}%")
-    
+    print(f"Initial Equity: ${equity_first:,.2f}")
+    print(f"Final Equity: ${equity_last:,.2f}")
+    print(f"Total Return: {(equity_last / equity_first - 1) * 100:.2f}%")
+    print(f"Max Equity: ${equity_max:,.2f}")
+    print(f"Min Equity: ${equity_min:,.2f}")
+    print(f"Max Drawdown: {max_drawdown:.2f}%")
+
     if trades_df is not None and len(trades_df) > 0:
-        print(f"\nTotal Trades: {len(trades_df)}")
-        print(f"Winning Trades: {len(trades_df[trades_df['pnl'] > 0])}")
-        print(f"Win Rate: {len(trades_df[trades_df['pnl'] > 0]) / len(trades_df) * 100:.2f}%")
-        print(f"Average PnL: ${trades_df['pnl'].mean():.2f}")
+        pnl = trades_df['pnl'].to_numpy()
+        wins = np.count_nonzero(pnl > 0)
+        print(f"\nTotal Trades: {len(pnl)}")
+        print(f"Winning Trades: {wins}")
+        print(f"Win Rate: {wins / len(pnl) * 100:.2f}%")
+        print(f"Average PnL: ${pnl.mean():.2f}")
         print(f"Average Duration: {trades_df['duration'].mean():.2f} seconds")
     
     print("\nPlots generated successfully!")